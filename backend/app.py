@@ -3,16 +3,25 @@
 # -*- coding: utf-8 -*-
 
 import os
-import io
+import hashlib
+import threading
 import json
+import shutil
 import tempfile
 import importlib
+import inspect
+from collections import OrderedDict
 from dataclasses import asdict, is_dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
+try:
+    import xxhash  # ~10 GB/s; hashing an upload costs nothing next to OCR
+except ImportError:
+    xxhash = None
+
 app = Flask(__name__)
 # Configure CORS to allow requests from the frontend
 CORS(app, resources={
@@ -50,15 +59,24 @@ def _load_parser():
 parser_mod = _load_parser()
 
 # Optional functions in your parser module:
+# - parse_pdf_stream(stream: file-like) -> Parsed | dict
 # - parse_pdf_bytes(data: bytes) -> Parsed | dict
 # - parse_pdf(path: str) -> Parsed | dict
 # - ocr_pdf_to_text(path: str | bytes) + parse_statement_text(text: str)
-HAS_PARSE_BYTES = hasattr(parser_mod, "parse_pdf_bytes")
-HAS_PARSE_PATH  = hasattr(parser_mod, "parse_pdf")
-HAS_OCR_TEXT    = hasattr(parser_mod, "ocr_pdf_to_text")
-HAS_PARSE_TEXT  = hasattr(parser_mod, "parse_statement_text")
+# Bound once here, so a request doesn't look them up (or inspect them) again
+_parse_pdf_stream = getattr(parser_mod, "parse_pdf_stream", None)
+_parse_pdf_bytes = getattr(parser_mod, "parse_pdf_bytes", None)
+_parse_pdf_path = getattr(parser_mod, "parse_pdf", None)
+_ocr_pdf_to_text = getattr(parser_mod, "ocr_pdf_to_text", None)
+_parse_statement_text = getattr(parser_mod, "parse_statement_text", None)
+
+def _takes_short_circuit(fn: Callable[..., Any]) -> bool:
+    # fn(data, short_circuit=fn) may stop OCR'ing pages once fn(text_so_far) is True
+    return _parse_statement_text is not None and "short_circuit" in inspect.signature(fn).parameters
 
 REQUIRED_KEYS = ["file", "card_provider", "available_credit", "payment_due_date", "new_balance", "credit_limit"]
+# Fields the frontend displays; once all are parsed the rest of the PDF can be skipped
+FRONTEND_KEYS = ["payment_due_date", "new_balance", "available_credit", "credit_limit"]
 
 def _normalize_result(obj: Any, filename: Optional[str]) -> Dict[str, Any]:
     if obj is None:
@@ -76,50 +94,111 @@ def _normalize_result(obj: Any, filename: Optional[str]) -> Dict[str, Any]:
         out.setdefault(k, None)
     return out
 
-def _parse_bytes(filename: str, data: bytes) -> Dict[str, Any]:
-    # 1) Preferred: parse_pdf_bytes
-    if HAS_PARSE_BYTES:
-        res = parser_mod.parse_pdf_bytes(data)  # type: ignore[attr-defined]
-        return _normalize_result(res, filename)
-
-    # 2) Fallback: parse_pdf(path)
-    if HAS_PARSE_PATH:
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-            tmp.write(data)
-            tmp.flush()
-            tmp_path = tmp.name
+def _frontend_fields_filled(text: str) -> bool:
+    res = _normalize_result(_parse_statement_text(text), None)
+    return all(res.get(k) for k in FRONTEND_KEYS)
+
+def _spill_to_temp(stream: BinaryIO) -> str:
+    stream.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        shutil.copyfileobj(stream, tmp)
+        return tmp.name
+
+# One strategy, picked at startup from what the parser module provides
+def _via_stream(stream: BinaryIO) -> Any:
+    # The upload is never read into a bytes object
+    return _parse_pdf_stream(stream)
+
+def _via_stream_short_circuit(stream: BinaryIO) -> Any:
+    return _parse_pdf_stream(stream, short_circuit=_frontend_fields_filled)
+
+def _via_bytes(stream: BinaryIO) -> Any:
+    stream.seek(0)
+    return _parse_pdf_bytes(stream.read())
+
+def _via_bytes_short_circuit(stream: BinaryIO) -> Any:
+    stream.seek(0)
+    return _parse_pdf_bytes(stream.read(), short_circuit=_frontend_fields_filled)
+
+def _via_path(stream: BinaryIO) -> Any:
+    tmp_path = _spill_to_temp(stream)
+    try:
+        return _parse_pdf_path(tmp_path)
+    finally:
         try:
-            res = parser_mod.parse_pdf(tmp_path)  # type: ignore[attr-defined]
-            return _normalize_result(res, filename)
+            os.unlink(tmp_path)
+        except Exception:
+            pass
+
+def _via_ocr_text(stream: BinaryIO) -> Any:
+    # Try the stream first if your ocr function supports it; else write to temp
+    try:
+        stream.seek(0)
+        text = _ocr_pdf_to_text(stream)
+        if not isinstance(text, str) or not text.strip():
+            raise TypeError
+    except Exception:
+        tmp_path = _spill_to_temp(stream)
+        try:
+            text = _ocr_pdf_to_text(tmp_path)
         finally:
             try:
                 os.unlink(tmp_path)
             except Exception:
                 pass
+    return _parse_statement_text(text)
 
-    # 3) Fallback: OCR text + parse_statement_text
-    if HAS_OCR_TEXT and HAS_PARSE_TEXT:
-        # Try bytes first if your ocr function supports it; else write to temp
-        try:
-            text = parser_mod.ocr_pdf_to_text(io.BytesIO(data))  # type: ignore[attr-defined]
-            if not isinstance(text, str) or not text.strip():
-                raise TypeError
-        except Exception:
-            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-                tmp.write(data)
-                tmp.flush()
-                tmp_path = tmp.name
-            try:
-                text = parser_mod.ocr_pdf_to_text(tmp_path)  # type: ignore[attr-defined]
-            finally:
-                try:
-                    os.unlink(tmp_path)
-                except Exception:
-                    pass
-        res = parser_mod.parse_statement_text(text)  # type: ignore[attr-defined]
-        return _normalize_result(res, filename)
+def _pick_strategy() -> Optional[Callable[[BinaryIO], Any]]:
+    # 1) Preferred: parse_pdf_stream
+    if _parse_pdf_stream is not None:
+        return _via_stream_short_circuit if _takes_short_circuit(_parse_pdf_stream) else _via_stream
+    # 2) parse_pdf_bytes
+    if _parse_pdf_bytes is not None:
+        return _via_bytes_short_circuit if _takes_short_circuit(_parse_pdf_bytes) else _via_bytes
+    # 3) Fallback: parse_pdf(path)
+    if _parse_pdf_path is not None:
+        return _via_path
+    # 4) Fallback: OCR text + parse_statement_text
+    if _ocr_pdf_to_text is not None and _parse_statement_text is not None:
+        return _via_ocr_text
+    return None
+
+_parse_strategy = _pick_strategy()
+
+def _parse_stream(filename: str, stream: BinaryIO) -> Dict[str, Any]:
+    if _parse_strategy is None:
+        raise RuntimeError("No compatible parse function found in parser module.")
+    return _normalize_result(_parse_strategy(stream), filename)
+
+# ---------------------------
+# Result cache (re-submits of the same statement skip the OCR pipeline)
+# ---------------------------
+RESULT_CACHE_SIZE = 256
+_result_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+def _content_key(stream: BinaryIO) -> bytes:
+    h = xxhash.xxh3_64() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(1 << 20), b""):
+        h.update(chunk)
+    stream.seek(0)
+    return h.digest()
+
+def _cache_get(key: bytes) -> Optional[Dict[str, Any]]:
+    with _result_cache_lock:
+        res = _result_cache.get(key)
+        if res is None:
+            return None
+        _result_cache.move_to_end(key)
+        return dict(res)
 
-    raise RuntimeError("No compatible parse function found in parser module.")
+def _cache_put(key: bytes, res: Dict[str, Any]) -> None:
+    with _result_cache_lock:
+        _result_cache[key] = dict(res)
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
 
 # ---------------------------
 # Routes
@@ -156,8 +235,11 @@ def parse_single():
         }), 400
 
     f = request.files["file"]
-    data = f.read()
-    if not data:
+    # Size the upload without reading it; werkzeug has already spooled it to memory/disk
+    f.stream.seek(0, os.SEEK_END)
+    empty = f.stream.tell() == 0
+    f.stream.seek(0)
+    if empty:
         return jsonify({
             "success": False,
             "error": "Empty file",
@@ -165,7 +247,11 @@ def parse_single():
         }), 400
 
     try:
-        result = _parse_bytes(f.filename or "uploaded.pdf", data)
+        key = _content_key(f.stream)
+        result = _cache_get(key)
+        if result is None:
+            result = _parse_stream(f.filename or "uploaded.pdf", f.stream)
+            _cache_put(key, result)
         
         # Map backend fields to frontend expected format
         response_data = {
@@ -196,4 +282,8 @@ def parse_single():
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", "5000"))
     debug = os.environ.get("FLASK_DEBUG", "0") == "1"
+    # Start OCR workers/models now rather than on the first /parse request; under the
+    # debug reloader only in the child process that serves, not the watching parent
+    if hasattr(parser_mod, "warmup") and (not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true"):
+        parser_mod.warmup()
     app.run(host="0.0.0.0", port=port, debug=debug)
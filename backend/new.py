@@ -19,76 +19,355 @@ Usage:
 import argparse
 import io
 import json
-import re
+import mmap
+import os
+import regex as re  # drop-in for `re`; its matcher is markedly faster on these patterns
 import sys
+import threading
 import unicodedata
+from bisect import bisect_left, bisect_right
+from math import hypot
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple
+from itertools import islice, repeat
+from multiprocessing import current_process, get_context
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 from datetime import datetime
 
 # ---------- OCR prerequisites ----------
-# pip install pymupdf pillow pytesseract
+# pip install pymupdf pillow pytesseract numpy
 # Also install Tesseract OCR on your system and ensure "tesseract" is on PATH.
+# Optional: pip install tesserocr  (runs Tesseract in-process instead of one subprocess per call)
+# Optional: pip install google-re2  (one linear-time scan per field in the pattern fast path)
+# Optional: pip install pyahocorasick  (provider detection in a single pass over the text)
 
 # ---------- Imports ----------
 import fitz  # PyMuPDF
-from PIL import Image, ImageFilter, ImageOps, ImageEnhance
+import numpy as np
+from PIL import Image, ImageFilter
 import pytesseract
+from pytesseract import Output
+
+try:
+    from tesserocr import PyTessBaseAPI, OEM, RIL, iterate_level
+except ImportError:  # fall back to the pytesseract CLI wrapper
+    PyTessBaseAPI = None
+
+try:
+    import re2  # google-re2: linear-time matching for the per-field fast path
+except ImportError:  # fall back to running the patterns one by one
+    re2 = None
+
+try:
+    import ahocorasick  # pyahocorasick: all literal provider markers in one pass
+except ImportError:  # fall back to one regex search per marker
+    ahocorasick = None
 
 # ---------- Rendering & OCR ----------
 
-def _preprocess_for_ocr(img: Image.Image) -> List[Image.Image]:
-    variants: List[Image.Image] = []
-    g = img.convert("L")
-    variants.append(g)
+# Fewer non-whitespace characters than this in the text layer means a scanned PDF
+TEXT_LAYER_MIN_CHARS = 200
 
-    v2 = ImageEnhance.Contrast(g).enhance(1.8)
-    v2 = ImageEnhance.Brightness(v2).enhance(1.05)
-    v2 = v2.filter(ImageFilter.UnsharpMask(radius=1, percent=170, threshold=3))
-    variants.append(v2)
+# 300 DPI is Tesseract's sweet spot; pages missing a summary field are retried sharper
+OCR_DPI = 300
+OCR_DPI_RETRY = 400
 
-    # create a thresholded (binary) variant using a lookup table to avoid lambda typing issues
-    lut = [0] * 256
-    for i in range(256):
-        lut[i] = 255 if i > 180 else 0
-    v3 = g.point(lut, mode="1").convert("L")
-    variants.append(v3)
+# The summary block (balance, limit, due date) sits in the top third of page 1.
+# As fractions of the page (x0, y0, x1, y1); OCR'd on its own before anything else.
+SUMMARY_REGION = (0.0, 0.0, 1.0, 1 / 3)
 
-    v4 = ImageOps.invert(g)
-    variants.append(v4)
+# Page segmentation mode. Labels are paired with values by word position, so
+# the PSM-dependent line segmentation no longer needs several modes.
+PSM = 6
+_CONFIG = f"--oem 3 --psm {PSM}"
 
-    return variants
 
+def _preprocess_for_ocr(img: Image.Image) -> Iterator[Image.Image]:
+    # Lazily yields variants, best first; callers usually stop after the first.
+    # The last two share one buffer, so OCR each variant before asking for the next.
+    g = img if img.mode == "L" else img.convert("L")
+    arr = np.asarray(g)
 
-def _ocr_image(img: Image.Image, lang: str = "eng") -> str:
-    texts = []
-    for psm in (6, 4, 3):
-        config = f"--oem 3 --psm {psm}"
-        try:
-            text = pytesseract.image_to_string(img, lang=lang, config=config) or ""
-        except Exception:
-            text = ""
-        texts.append(text)
-    return "\n".join(t for t in texts if t)
+    # contrast x1.8 then brightness x1.05 are per-pixel blends around the mean,
+    # so both fold into one lookup table: PIL's own blends on the 256 gray levels.
+    # (The exact integer sum gives the same mean as ImageStat, without its histogram.)
+    mean = int(int(arr.sum(dtype=np.uint64)) / arr.size + 0.5)
+    levels = Image.frombytes("L", (256, 1), bytes(range(256)))
+    lut = Image.blend(Image.new("L", (256, 1), mean), levels, 1.8)
+    lut = Image.blend(Image.new("L", (256, 1), 0), lut, 1.05)
+    v2 = g.point(list(lut.tobytes()))
+    yield v2.filter(ImageFilter.UnsharpMask(radius=1, percent=170, threshold=3))
+
+    yield g
+
+    buf = np.empty_like(arr)
+
+    # thresholded (binary) variant: vectorized compare, then 0/1 -> 0/255 in place
+    np.greater(arr, 180, out=buf.view(np.bool_))
+    buf *= 255
+    yield Image.frombuffer("L", g.size, buf, "raw", "L", 0, 1)
 
+    # inverted variant, written over the binary one
+    np.subtract(255, arr, out=buf)
+    yield Image.frombuffer("L", g.size, buf, "raw", "L", 0, 1)
 
-def ocr_pdf_to_text(path: str, dpi: int = 340) -> str:
-    chunks: List[str] = []
+
+# tesserocr APIs keep the language model loaded between calls. They are built
+# lazily per process and only used from pool workers, one page at a time.
+_TESS_APIS: Dict[Tuple[str, int], "PyTessBaseAPI"] = {}
+
+
+def _tess_api(lang: str, psm: int) -> "PyTessBaseAPI":
+    api = _TESS_APIS.get((lang, psm))
+    if api is None:
+        api = PyTessBaseAPI(lang=lang, psm=psm, oem=OEM.DEFAULT)
+        _TESS_APIS[(lang, psm)] = api
+    return api
+
+
+def _ocr_image(img: Image.Image, lang: str = "eng") -> str:
     try:
-        doc = fitz.open(path)
+        if PyTessBaseAPI is not None:
+            api = _tess_api(lang, PSM)
+            api.SetImage(img)
+            return api.GetUTF8Text() or ""
+        return pytesseract.image_to_string(img, lang=lang, config=_CONFIG) or ""
     except Exception:
         return ""
-    for page in doc:
+
+
+class _Word(NamedTuple):
+    text: str
+    left: int
+    top: int
+    right: int
+    bottom: int
+    line: int
+
+
+def _ocr_image_data(img: Image.Image, lang: str = "eng") -> Tuple[str, List[_Word]]:
+    # One recognition pass giving both the page text and the word boxes
+    words: List[_Word] = []
+    try:
+        if PyTessBaseAPI is not None:
+            api = _tess_api(lang, PSM)
+            api.SetImage(img)
+            api.Recognize()
+            text = api.GetUTF8Text() or ""
+            it = api.GetIterator()
+            line = -1
+            for w in (iterate_level(it, RIL.WORD) if it is not None else ()):
+                if w.IsAtBeginningOf(RIL.TEXTLINE):
+                    line += 1
+                word = w.GetUTF8Text(RIL.WORD)
+                box = w.BoundingBox(RIL.WORD)
+                if word and box:
+                    words.append(_Word(word, box[0], box[1], box[2], box[3], line))
+            return text, words
+        data = pytesseract.image_to_data(img, lang=lang, config=_CONFIG, output_type=Output.DICT)
+    except Exception:
+        return "", []
+    lines: Dict[Tuple[int, int, int], List[str]] = {}
+    for i, word in enumerate(data["text"]):
+        if not word or not word.strip():
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        if key not in lines:
+            lines[key] = []
+        lines[key].append(word)
+        left, top = data["left"][i], data["top"][i]
+        words.append(_Word(word, left, top, left + data["width"][i], top + data["height"][i], len(lines) - 1))
+    return "\n".join(" ".join(ws) for ws in lines.values()), words
+
+
+# Word-level value tokens: amounts need cents, thousands separators or a "$" (skips page numbers)
+_WORD_AMOUNT = re.compile(r"\$?-?\(?(?:\d[\d,]*\.\d{2}|\d{1,3}(?:,\d{3})+)\)?|\$-?\d+")
+_WORD_DATE = re.compile(r"\d{1,2}/\d{1,2}/\d{2,4}")
+
+
+def _nearest_value(label: List[_Word], values: List[_Word]) -> Optional[_Word]:
+    # Closest value to the right of the label on its row, or below it within a few line heights
+    x0 = min(w.left for w in label)
+    x1 = max(w.right for w in label)
+    y0 = min(w.top for w in label)
+    y1 = max(w.bottom for w in label)
+    reach = 4 * max(y1 - y0, 1)
+    best, best_d = None, 0.0
+    for v in values:
+        cy = (v.top + v.bottom) / 2
+        if y0 <= cy <= y1 and v.left >= x1:
+            d = float(v.left - x1)
+        elif y1 <= v.top <= y1 + reach and v.right > x0:
+            d = hypot(max(0, v.left - x1), v.top - y1)
+        else:
+            continue
+        if best is None or d < best_d:
+            best, best_d = v, d
+    return best
+
+
+def _spatial_summary(words: List[_Word]) -> List[str]:
+    # "Label value" lines built from word positions rather than Tesseract's line breaks
+    rows: Dict[int, List[_Word]] = {}
+    for w in words:
+        rows.setdefault(w.line, []).append(w)
+    amounts = [w for w in words if _WORD_AMOUNT.fullmatch(w.text)]
+    dates = [w for w in words if _WORD_DATE.fullmatch(w.text)]
+    out: List[str] = []
+    for row in rows.values():
+        row_text = ""
+        spans: List[Tuple[int, int]] = []
+        prev: Optional[_Word] = None
+        for w in row:
+            if prev is not None:
+                # a wide gap is a column break; "|" keeps labels from running across it
+                row_text += " | " if w.left - prev.right > 1.5 * (w.bottom - w.top) else " "
+            spans.append((len(row_text), len(row_text) + len(w.text)))
+            row_text += w.text
+            prev = w
+        found = [(field, m, values)
+                 for field, (labels, values) in enumerate(((LBL_NEWBAL, amounts), (LBL_LIMIT, amounts),
+                                                           (LBL_AVAIL, amounts), (LBL_DUEDATE, dates)))
+                 for lr in labels for m in lr.finditer(row_text)]
+        for field, m, values in found:
+            # Labels of two fields overlapping are one phrase: only the longest (then
+            # leftmost) counts, so "Available Credit Line" isn't also a "Credit Line" row
+            rank = (m.start() - m.end(), m.start())
+            if any(f != field and o.start() < m.end() and m.start() < o.end() and (o.start() - o.end(), o.start()) < rank
+                   for f, o, _ in found):
+                continue
+            run = [w for w, (a, b) in zip(row, spans) if a < m.end() and b > m.start()]
+            v = _nearest_value(run, values)
+            if v is not None:
+                out.append(f"{m.group(0)} {v.text}")
+    return out
+
+
+def _open_pdf(src: Union[str, bytes]) -> fitz.Document:
+    if isinstance(src, (bytes, bytearray)):
+        return fitz.open(stream=src, filetype="pdf")
+    return fitz.open(src)
+
+
+def _pixmap_to_image(pix: fitz.Pixmap) -> Image.Image:
+    # Wrap the raw samples (samples_mv skips the intermediate bytes copy). Builds
+    # without it, or pixmaps whose rows aren't plain gray bytes, go through PNM:
+    # an uncompressed dump that PIL decodes with a memcpy, unlike PNG's deflate.
+    if pix.n == 1 and pix.stride == pix.width:
+        return Image.frombytes("L", (pix.width, pix.height), getattr(pix, "samples_mv", None) or pix.samples)
+    return Image.open(io.BytesIO(pix.tobytes("ppm"))).convert("L")
+
+
+def _ocr_one_page(src: Union[str, bytes], page_index: int, dpi: int, thorough: bool = False,
+                  region: Optional[Tuple[float, float, float, float]] = None) -> str:
+    # Runs inside a pool worker: open the PDF, render just this page, OCR it.
+    # The fast pass OCRs only the primary variant, and puts the spatially paired
+    # label/value lines first; the thorough pass OCRs the remaining variants.
+    # `region` (fractions of the page) renders only that part of it.
+    doc = _open_pdf(src)
+    try:
+        page = doc[page_index]
         mat = fitz.Matrix(dpi / 72.0, dpi / 72.0)
-        pix = page.get_pixmap(matrix=mat, alpha=False)
-        img = Image.open(io.BytesIO(pix.tobytes("png")))
-        page_texts: List[str] = []
-        for variant in _preprocess_for_ocr(img):
-            page_texts.append(_ocr_image(variant))
-        chunks.append("\n".join(page_texts))
+        clip = None
+        if region is not None:
+            r = page.rect
+            clip = fitz.Rect(r.x0 + region[0] * r.width, r.y0 + region[1] * r.height,
+                             r.x0 + region[2] * r.width, r.y0 + region[3] * r.height)
+        # render straight to grayscale and wrap the raw samples (no PNG encode/decode)
+        pix = page.get_pixmap(matrix=mat, alpha=False, colorspace=fitz.csGRAY, clip=clip)
+        img = _pixmap_to_image(pix)
+    finally:
+        doc.close()
+    variants = _preprocess_for_ocr(img)
+    primary = next(variants)
+    if not thorough:
+        text, words = _ocr_image_data(primary)
+        return "\n".join(_spatial_summary(words) + [text])
+    page_texts: List[str] = []
+    for variant in variants:
+        page_texts.append(_ocr_image(variant))
+    return "\n".join(page_texts)
+
+
+# Pages are independent and OCR is CPU-bound, so they are fanned out over a
+# process pool. "spawn" keeps workers safe to start from Flask's threads.
+_OCR_POOL: Optional[ProcessPoolExecutor] = None
+_OCR_POOL_LOCK = threading.Lock()
+_OCR_WORKERS = os.cpu_count() or 1
+
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    global _OCR_POOL
+    with _OCR_POOL_LOCK:
+        if _OCR_POOL is None:
+            # one Tesseract thread per worker; the pool provides the parallelism
+            os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+            ctx = get_context("spawn")
+            _OCR_POOL = ProcessPoolExecutor(max_workers=_OCR_WORKERS, mp_context=ctx, initializer=_init_worker,
+                                            initargs=(ctx.Barrier(_OCR_WORKERS),))
+        return _OCR_POOL
+
+
+def _ocr_pages_in_order(src: Union[str, bytes], pages: Iterable[int], dpi: int) -> Iterator[str]:
+    # Like pool.map, but keeps only one pool's worth of pages in flight, so a
+    # caller that stops early does not leave the rest of the document queued
+    pool = _get_ocr_pool()
+    todo = iter(pages)
+    pending = deque(pool.submit(_ocr_one_page, src, i, dpi) for i in islice(todo, _OCR_WORKERS))
+    try:
+        while pending:
+            text = pending.popleft().result()
+            for i in islice(todo, 1):
+                pending.append(pool.submit(_ocr_one_page, src, i, dpi))
+            yield text
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+
+_WORKER_BARRIER: Optional[threading.Barrier] = None
+
+
+def _init_worker(barrier: threading.Barrier) -> None:
+    # Runs once as each pool worker starts: keep the pool's start barrier and, with
+    # tesserocr, load the model now (a blank page OCRs to "")
+    global _WORKER_BARRIER
+    _WORKER_BARRIER = barrier
+    if PyTessBaseAPI is not None:
+        _ocr_image_data(Image.new("L", (64, 64), 255))
+
+
+def _warm_worker() -> None:
+    # Workers start on demand: a job that only returns once every worker holds one
+    # makes the pool start all of them
+    _WORKER_BARRIER.wait(timeout=60)
+
+
+def warmup() -> None:
+    """Pay the one-off start-up costs before the first request does: MuPDF's
+    init and, with tesserocr, the pool's workers with their models loaded. The
+    pytesseract CLI keeps nothing loaded between calls, so there the pool is
+    left to start on demand."""
+    if current_process().name != "MainProcess":
+        # spawned workers re-run the caller's main module; only the parent warms up
+        return
+    doc = fitz.open()
+    doc.new_page(width=72, height=72)
+    fitz.open(stream=doc.tobytes(), filetype="pdf").close()
     doc.close()
+    if PyTessBaseAPI is None:
+        return
+    pool = _get_ocr_pool()
+    for fut in [pool.submit(_warm_worker) for _ in range(_OCR_WORKERS)]:
+        try:
+            fut.result()
+        except threading.BrokenBarrierError:
+            break  # a worker didn't come up in time; the rest start on demand
 
-    text = "\n".join(chunks)
+
+def _clean_ocr_text(text: str) -> str:
     text = unicodedata.normalize("NFKD", text or "")
     text = text.replace("\xa0", " ")
     text = re.sub(r"[·•●•]+", " ", text)
@@ -97,6 +376,147 @@ def ocr_pdf_to_text(path: str, dpi: int = 340) -> str:
     return text
 
 
+def _has_summary_labels(text: str) -> bool:
+    # Enough for the label-anchored extraction to work with
+    return bool(detect_provider(text)) and any(p.search(text) for p in LBL_NEWBAL + LBL_LIMIT)
+
+
+def _region_suffices(head: str, short_circuit: Optional[Callable[[str], bool]]) -> bool:
+    # The summary region stands in for whole pages only when they could add nothing:
+    # it has to carry a provider marker (often a footer; it also picks the issuer
+    # patterns) besides the summary fields, and for callers without a short_circuit
+    # (the CLI keeps every field) an available-credit amount read off the region,
+    # not one derived from the limit and balance
+    if not detect_provider(head) or not summary_complete(head):
+        return False
+    if short_circuit is not None:
+        return short_circuit(head)
+    issuer = detect_provider(head)
+    specific = ISSUER_SPECIFIC.get(issuer, {})
+    labels = LBL_BOA_AVAIL if issuer == "Bank of America" else LBL_AVAIL
+    return bool(find_first_amount(head, specific.get("available_credit", []), _FAST.get(issuer, {}).get("available_credit"))
+                or find_first_amount(head, PATTERNS["available_credit"], _FAST_GLOBAL["available_credit"])
+                or extract_label_amount_lines(head, labels, lines_ahead=3))
+
+
+def _summary_pages(page_texts: List[str], limit: int = 2) -> List[int]:
+    # Pages carrying summary labels (the block sits on page 1 or 2); else the first page
+    pages = [i for i, t in enumerate(page_texts) if _ALL_LABELS.search(t)]
+    return pages[:limit] or [0]
+
+
+def _ocr_doc(doc: fitz.Document, src: Union[str, bytes, memoryview], dpi: int,
+             short_circuit: Optional[Callable[[str], bool]] = None) -> str:
+    # `src` (a path or the raw PDF bytes) is what the workers reopen the document from.
+    # `short_circuit` gets the text OCR'd so far after each page; True stops early.
+    page_count = len(doc)
+    if page_count == 0:
+        return ""
+
+    # Born-digital statements carry a text layer: read it and skip OCR entirely
+    layer = "\n".join(page.get_text("text") for page in doc)
+    if len("".join(layer.split())) > TEXT_LAYER_MIN_CHARS:
+        return _clean_ocr_text(layer)
+
+    if isinstance(src, memoryview):
+        # a mapped upload can't be pickled; the workers get a copy, but only for scans
+        src = src.tobytes()
+
+    # Tesseract's cost is linear in pixels: try just the summary region of page 1
+    # first, and only OCR whole pages when it doesn't carry everything they would
+    pool = _get_ocr_pool()
+    head = _clean_ocr_text(pool.submit(_ocr_one_page, src, 0, dpi, False, SUMMARY_REGION).result())
+    if _region_suffices(head, short_circuit):
+        return head
+
+    # Per-page text, so later passes only redo the pages they need
+    fast: List[str] = []
+    for page_text in _ocr_pages_in_order(src, range(page_count), dpi):
+        fast.append(page_text)
+        if short_circuit is not None and short_circuit(_clean_ocr_text("\n".join(fast))):
+            break
+    done = range(len(fast))
+    extra = [""] * len(fast)
+
+    def joined() -> str:
+        return _clean_ocr_text("\n".join(f + "\n" + e if e else f for f, e in zip(fast, extra)))
+
+    text = joined()
+
+    # Only when the single fast pass missed the summary labels, OCR the other variants too
+    if not _has_summary_labels(text):
+        extra = list(pool.map(_ocr_one_page, repeat(src), done, repeat(dpi), repeat(True)))
+        text = joined()
+
+    # Still missing a summary field: re-render just the summary pages at a higher DPI
+    if dpi < OCR_DPI_RETRY and not summary_complete(text):
+        pages = _summary_pages(fast)
+        for i, t in zip(pages, pool.map(_ocr_one_page, repeat(src), pages, repeat(OCR_DPI_RETRY))):
+            fast[i] = t
+        text = joined()
+    return text
+
+
+def ocr_pdf_to_text(path: str, dpi: int = OCR_DPI, short_circuit: Optional[Callable[[str], bool]] = None) -> str:
+    try:
+        doc = fitz.open(path)
+    except Exception:
+        return ""
+    try:
+        return _ocr_doc(doc, path, dpi, short_circuit)
+    finally:
+        doc.close()
+
+
+def ocr_pdf_from_bytes(data: Union[bytes, memoryview], dpi: int = OCR_DPI, short_circuit: Optional[Callable[[str], bool]] = None) -> str:
+    try:
+        doc = fitz.open(stream=data, filetype="pdf")
+    except Exception:
+        return ""
+    try:
+        return _ocr_doc(doc, data, dpi, short_circuit)
+    finally:
+        doc.close()
+
+
+@contextmanager
+def _stream_view(stream: BinaryIO) -> Iterator[Union[bytes, memoryview]]:
+    # The PDF's bytes without copying them onto the heap where possible: a BytesIO's
+    # own buffer (also inside a SpooledTemporaryFile still held in memory), or a
+    # read-only mapping of a stream that is already a real file. fileno() on an
+    # in-memory spool would first write it out to disk, so it's never called there.
+    getbuffer = getattr(stream, "getbuffer", None)
+    if getbuffer is None and not getattr(stream, "_rolled", True):
+        getbuffer = getattr(getattr(stream, "_file", None), "getbuffer", None)
+    if getbuffer is not None:
+        with getbuffer() as view:
+            yield view
+        return
+    mapped = None
+    if getattr(stream, "_rolled", True):
+        try:
+            mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError):
+            mapped = None
+    if mapped is None:
+        stream.seek(0)
+        yield stream.read()
+        return
+    try:
+        with memoryview(mapped) as view:
+            yield view
+    finally:
+        try:
+            mapped.close()
+        except BufferError:
+            pass  # something still holds a slice of it; the mapping goes with that
+
+
+def ocr_pdf_from_stream(stream: BinaryIO, dpi: int = OCR_DPI, short_circuit: Optional[Callable[[str], bool]] = None) -> str:
+    with _stream_view(stream) as data:
+        return ocr_pdf_from_bytes(data, dpi=dpi, short_circuit=short_circuit)
+
+
 # ---------- Regex Patterns ----------
 
 PROVIDERS: List[Tuple[str, List[re.Pattern]]] = [
@@ -215,13 +635,126 @@ ISSUER_SPECIFIC: Dict[str, Dict[str, List[re.Pattern]]] = {
     },
 }
 
+# ---------- Fast path: one scan per field ----------
+# Each field's pattern list is also frozen into a single alternation, compiled
+# with RE2 (a DFA, so one linear scan however many patterns there are; the same
+# alternation in `re` backtracks through every branch at every offset and is
+# slower than the loop). One search finds where the earliest of the patterns
+# first matches and which one, so a field with no match costs one scan, and the
+# rest only search from that point on. Priority order is unchanged.
+_INLINE_FLAGS = re.compile(r"^\(\?([a-zA-Z]+)\)")
+# RE2's \s lacks \v; spell out what `regex`'s \s matches in ASCII text (unlike
+# stdlib re, not \x1c-\x1f)
+_PY_ASCII_SPACE = r"[\t-\r ]"
+
+
+def _union(patterns: List[re.Pattern]) -> Optional[Any]:
+    if re2 is None or not patterns:
+        return None
+    parts = []
+    for i, p in enumerate(patterns):
+        m = _INLINE_FLAGS.match(p.pattern)
+        body = f"(?{m.group(1)}:{p.pattern[m.end():]})" if m else p.pattern
+        body = body.replace(r"\s", _PY_ASCII_SPACE)
+        parts.append(f"(?P<p{i}>{body})")
+    return re2.compile("|".join(parts))
+
+
+_FAST: Dict[str, Dict[str, Optional[Any]]] = {
+    issuer: {field: _union(plist) for field, plist in fields.items()}
+    for issuer, fields in ISSUER_SPECIFIC.items()
+}
+_FAST_GLOBAL: Dict[str, Optional[Any]] = {field: _union(plist) for field, plist in PATTERNS.items()}
+
+
+def _first_matches(text: str, patterns: List[re.Pattern],
+                   union: Optional[Any] = None) -> Iterator[Tuple[re.Pattern, re.Match]]:
+    # Each pattern's first match, in pattern order (patterns without one are skipped).
+    # RE2 (with \s spelled out as above) and `regex` agree on ASCII text; anything
+    # else takes the plain loop.
+    if union is None or not text.isascii():
+        for p in patterns:
+            m = p.search(text)
+            if m:
+                yield p, m
+        return
+    hit = union.search(text)
+    if hit is None:
+        return
+    s, g = hit.start(), int(hit.lastgroup[1:])
+    for i, p in enumerate(patterns):
+        if i == g:
+            # should the engines ever disagree here, the pattern still gets its real match
+            m = p.match(text, s) or p.search(text, s + 1)
+        else:
+            # patterns before g don't match at s (the alternation would have taken them)
+            m = p.search(text, s + 1 if i < g else s)
+        if m:
+            yield p, m
+
+
 # ---------- Helpers ----------
 
+# Most provider markers are plain words: "\bBank\s+of\s+America\b" is the literal
+# "bank of america" in lowercased text with whitespace runs collapsed to one
+# space, plus word-boundary checks at both ends. Those go into one Aho-Corasick
+# automaton; the rest ("\s*", optional characters, ...) stay regexes.
+_LITERAL_MARKER = re.compile(r"\\b((?:[A-Za-z0-9]|\\s\+|\\\.)+)(?:\\b)?(?:\\b|\(\?!\\w\))")
+
+
+def _build_provider_automaton() -> Tuple[Any, List[List[re.Pattern]]]:
+    residual: List[List[re.Pattern]] = []
+    automaton = ahocorasick.Automaton() if ahocorasick is not None else None
+    for rank, (_, pats) in enumerate(PROVIDERS):
+        residual.append([])
+        for p in pats:
+            m = _LITERAL_MARKER.fullmatch(p.pattern) if p.flags & re.I else None
+            if automaton is None or m is None:
+                residual[rank].append(p)
+                continue
+            marker = m.group(1).replace(r"\s+", " ").replace(r"\.", ".").lower()
+            automaton.add_word(marker, (rank, len(marker)))
+    if automaton is not None:
+        automaton.make_automaton()
+    return automaton, residual
+
+
+_PROVIDER_AUTOMATON, _PROVIDER_RESIDUAL = _build_provider_automaton()
+# str.split() takes these for whitespace, the markers' \s (`regex`) doesn't
+_SPLIT_ONLY_SPACES = "\x1c\x1d\x1e\x1f"
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
 def detect_provider(text: str) -> Optional[str]:
-    for name, pats in PROVIDERS:
-        if any(p.search(text) for p in pats):
-            return name
-    return None
+    # First provider (in PROVIDERS order) with any marker anywhere in the text
+    if _PROVIDER_AUTOMATON is None or not text.isascii() or any(c in text for c in _SPLIT_ONLY_SPACES):
+        # lowercasing only mirrors re.I on ASCII ("ſ" is "s" to re.I; "İ".lower() is two
+        # characters), and split() below would turn \x1c-\x1f into spaces
+        for name, pats in PROVIDERS:
+            if any(p.search(text) for p in pats):
+                return name
+        return None
+    best = len(PROVIDERS)
+    folded = " ".join(text.lower().split())
+    for end, (rank, size) in _PROVIDER_AUTOMATON.iter(folded):
+        start = end - size + 1
+        if rank >= best:
+            continue
+        if start > 0 and _is_word_char(folded[start - 1]):
+            continue
+        if end + 1 < len(folded) and _is_word_char(folded[end + 1]):
+            continue
+        best = rank
+        if best == 0:
+            break
+    # Only providers ranked above the best literal hit still need their regexes
+    for rank in range(best):
+        if any(p.search(text) for p in _PROVIDER_RESIDUAL[rank]):
+            return PROVIDERS[rank][0]
+    return PROVIDERS[best][0] if best < len(PROVIDERS) else None
 
 def _normalize_amount(raw: Optional[str]) -> Optional[str]:
     if not raw:
@@ -251,15 +784,31 @@ def _fmt_money(x: float) -> str:
 
 CURR_ANY = re.compile(r"\$?\s*-?\(?\d[\d,]*\.?\d{0,2}\)?(?:\s*(?:CR|DR))?")
 
-def _collect_amounts_near(lines: List[str], i: int, start_col: int, lines_ahead: int) -> List[str]:
-    cands: List[str] = []
-    # same-line after label
-    after = lines[i][start_col:]
-    cands += [m.group(0).strip() for m in CURR_ANY.finditer(after)]
+# line number -> (start columns, stripped CURR_ANY tokens); filled lazily, shared by all fields
+AmountIndex = Dict[int, Tuple[List[int], List[str]]]
+
+def _line_amounts(lines: List[str], i: int, amounts: AmountIndex) -> Tuple[List[int], List[str]]:
+    hit = amounts.get(i)
+    if hit is None:
+        starts: List[int] = []
+        values: List[str] = []
+        for m in CURR_ANY.finditer(lines[i]):
+            starts.append(m.start())
+            values.append(m.group(0).strip())
+        hit = amounts[i] = (starts, values)
+    return hit
+
+def _collect_amounts_near(lines: List[str], i: int, start_col: int, lines_ahead: int,
+                          amounts: Optional[AmountIndex] = None) -> List[str]:
+    if amounts is None:
+        amounts = {}
+    # same-line after label (a label ends on a letter, so no token straddles start_col)
+    starts, values = _line_amounts(lines, i, amounts)
+    cands = values[bisect_left(starts, start_col):]
     # next few lines
     for j in range(1, lines_ahead + 1):
         if i + j < len(lines):
-            cands += [m.group(0).strip() for m in CURR_ANY.finditer(lines[i + j])]
+            cands += _line_amounts(lines, i + j, amounts)[1]
     return cands
 
 def _best_amount_for_label(label: str, candidates: List[str], avoid_zero: bool = True, min_value: float = 0.0) -> Optional[str]:
@@ -290,14 +839,20 @@ def _best_amount_for_label(label: str, candidates: List[str], avoid_zero: bool =
     return scored[0][1]
 
 def extract_label_amount_lines(text: str, label_regexes: List[re.Pattern], lines_ahead: int = 3,
-                               avoid_zero: bool = False, min_value: float = 0.0) -> Optional[str]:
-    lines = text.splitlines()
-    for i, line in enumerate(lines):
+                               avoid_zero: bool = False, min_value: float = 0.0,
+                               lines: Optional[List[str]] = None, label_lines: Optional[List[int]] = None,
+                               amounts: Optional[AmountIndex] = None) -> Optional[str]:
+    if lines is None:
+        lines = text.splitlines()
+    if label_lines is None:
+        label_lines = _label_line_indices(text)
+    for i in label_lines:
+        line = lines[i]
         for lr in label_regexes:
             m = lr.search(line)
             if not m:
                 continue
-            cands = _collect_amounts_near(lines, i, m.end(), lines_ahead)
+            cands = _collect_amounts_near(lines, i, m.end(), lines_ahead, amounts)
             best = _best_amount_for_label(lr.pattern, cands, avoid_zero=avoid_zero, min_value=min_value)
             if best:
                 return best
@@ -327,9 +882,14 @@ def _normalize_date(text_fragment: str) -> Optional[str]:
         return None
     return d.strftime("%m/%d/%y")
 
-def extract_label_date_lines(text: str, label_regexes: List[re.Pattern], lines_ahead: int = 2) -> Optional[str]:
-    lines = text.splitlines()
-    for i, line in enumerate(lines):
+def extract_label_date_lines(text: str, label_regexes: List[re.Pattern], lines_ahead: int = 2,
+                             lines: Optional[List[str]] = None, label_lines: Optional[List[int]] = None) -> Optional[str]:
+    if lines is None:
+        lines = text.splitlines()
+    if label_lines is None:
+        label_lines = _label_line_indices(text)
+    for i in label_lines:
+        line = lines[i]
         for lr in label_regexes:
             if not lr.search(line):
                 continue
@@ -373,6 +933,33 @@ LBL_DUEDATE = [
     re.compile(r"(?i)\bStatement\s*ends?\b"),
 ]
 
+# Every label above as one alternation (all are case-insensitive), so a single
+# finditer over the text finds the lines worth looking at for any field
+_ALL_LABELS = re.compile(
+    "|".join(
+        f"(?:{p.pattern[len('(?i)'):]})"
+        for group in (LBL_BOA_LIMIT, LBL_BOA_AVAIL, LBL_BOA_NEWBAL, LBL_BOA_DUE,
+                      LBL_AVAIL, LBL_NEWBAL, LBL_LIMIT, LBL_DUEDATE)
+        for p in group
+    ),
+    re.I,
+)
+
+def _label_line_indices(text: str) -> List[int]:
+    # Line numbers match text.splitlines(). A match spanning a line break (labels
+    # allow \s*) marks every line it touches, so no per-line label hit is missed.
+    starts: List[int] = []
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        starts.append(pos)
+        pos += len(line)
+    hit = set()
+    for m in _ALL_LABELS.finditer(text):
+        first = bisect_right(starts, m.start()) - 1
+        last = bisect_right(starts, max(m.end() - 1, m.start())) - 1
+        hit.update(range(first, last + 1))
+    return sorted(hit)
+
 # ---------- Core parse ----------
 
 @dataclass
@@ -384,11 +971,8 @@ class ParsedStatement:
     new_balance: Optional[str]
     credit_limit: Optional[str]
 
-def find_first_amount(text: str, patterns: List[re.Pattern]) -> Optional[str]:
-    for p in patterns:
-        m = p.search(text)
-        if not m:
-            continue
+def find_first_amount(text: str, patterns: List[re.Pattern], union: Optional[Any] = None) -> Optional[str]:
+    for p, m in _first_matches(text, patterns, union):
         # search all amounts within match; choose largest non-zero
         amounts = [m2.group(0) for m2 in CURR_ANY.finditer(m.group(0))]
         best = _best_amount_for_label(p.pattern, amounts, avoid_zero=True)
@@ -396,11 +980,8 @@ def find_first_amount(text: str, patterns: List[re.Pattern]) -> Optional[str]:
             return best
     return None
 
-def find_first_date(text: str, patterns: List[re.Pattern]) -> Optional[str]:
-    for p in patterns:
-        m = p.search(text)
-        if not m:
-            continue
+def find_first_date(text: str, patterns: List[re.Pattern], union: Optional[Any] = None) -> Optional[str]:
+    for _, m in _first_matches(text, patterns, union):
         out = _normalize_date(m.group(0))
         if out:
             return out
@@ -410,41 +991,50 @@ def parse_statement_text(text: str) -> ParsedStatement:
     issuer = detect_provider(text) or "Unknown"
 
     # 1) Issuer-specific strong patterns first
-    available_credit = find_first_amount(text, ISSUER_SPECIFIC.get(issuer, {}).get("available_credit", []))
-    payment_due_date = find_first_date(text, ISSUER_SPECIFIC.get(issuer, {}).get("payment_due_date", []))
-    new_balance = find_first_amount(text, ISSUER_SPECIFIC.get(issuer, {}).get("new_balance", []))
-    credit_limit = find_first_amount(text, ISSUER_SPECIFIC.get(issuer, {}).get("credit_limit", []))
+    specific = ISSUER_SPECIFIC.get(issuer, {})
+    fast = _FAST.get(issuer, {})
+    available_credit = find_first_amount(text, specific.get("available_credit", []), fast.get("available_credit"))
+    payment_due_date = find_first_date(text, specific.get("payment_due_date", []), fast.get("payment_due_date"))
+    new_balance = find_first_amount(text, specific.get("new_balance", []), fast.get("new_balance"))
+    credit_limit = find_first_amount(text, specific.get("credit_limit", []), fast.get("credit_limit"))
 
     # 2) Global patterns if still missing
     if not available_credit:
-        available_credit = find_first_amount(text, PATTERNS["available_credit"])
+        available_credit = find_first_amount(text, PATTERNS["available_credit"], _FAST_GLOBAL["available_credit"])
     if not payment_due_date:
-        payment_due_date = find_first_date(text, PATTERNS["payment_due_date"])
+        payment_due_date = find_first_date(text, PATTERNS["payment_due_date"], _FAST_GLOBAL["payment_due_date"])
     if not new_balance:
-        new_balance = find_first_amount(text, PATTERNS["new_balance"])
+        new_balance = find_first_amount(text, PATTERNS["new_balance"], _FAST_GLOBAL["new_balance"])
     if not credit_limit:
-        credit_limit = find_first_amount(text, PATTERNS["credit_limit"])
+        credit_limit = find_first_amount(text, PATTERNS["credit_limit"], _FAST_GLOBAL["credit_limit"])
 
     # 3) Line-anchored label extraction (issuer-aware first, then generic)
-    if issuer == "Bank of America":
-        # Prefer the maximum near the label; exclude zero; enforce sensible mins
-        if not new_balance:
-            new_balance = extract_label_amount_lines(text, LBL_BOA_NEWBAL, lines_ahead=2, avoid_zero=True, min_value=10.0)
-        if not credit_limit:
-            credit_limit = extract_label_amount_lines(text, LBL_BOA_LIMIT, lines_ahead=3, avoid_zero=True, min_value=500.0)
-        if not available_credit:
-            available_credit = extract_label_amount_lines(text, LBL_BOA_AVAIL, lines_ahead=3, avoid_zero=False, min_value=0.0)
-        if not payment_due_date:
-            payment_due_date = extract_label_date_lines(text, LBL_BOA_DUE, lines_ahead=1)
-    else:
-        if not new_balance:
-            new_balance = extract_label_amount_lines(text, LBL_NEWBAL, lines_ahead=3, avoid_zero=False)
-        if not credit_limit:
-            credit_limit = extract_label_amount_lines(text, LBL_LIMIT, lines_ahead=3, avoid_zero=True, min_value=500.0)
-        if not available_credit:
-            available_credit = extract_label_amount_lines(text, LBL_AVAIL, lines_ahead=3, avoid_zero=False)
-        if not payment_due_date:
-            payment_due_date = extract_label_date_lines(text, LBL_DUEDATE, lines_ahead=2)
+    if not (available_credit and payment_due_date and new_balance and credit_limit):
+        # one pass over the text finds every labelled line; lines are split and
+        # their amounts tokenized at most once, shared by all fields
+        lines = text.splitlines()
+        label_lines = _label_line_indices(text)
+        idx = dict(lines=lines, label_lines=label_lines)
+        amounts: AmountIndex = {}
+        if issuer == "Bank of America":
+            # Prefer the maximum near the label; exclude zero; enforce sensible mins
+            if not new_balance:
+                new_balance = extract_label_amount_lines(text, LBL_BOA_NEWBAL, lines_ahead=2, avoid_zero=True, min_value=10.0, amounts=amounts, **idx)
+            if not credit_limit:
+                credit_limit = extract_label_amount_lines(text, LBL_BOA_LIMIT, lines_ahead=3, avoid_zero=True, min_value=500.0, amounts=amounts, **idx)
+            if not available_credit:
+                available_credit = extract_label_amount_lines(text, LBL_BOA_AVAIL, lines_ahead=3, avoid_zero=False, min_value=0.0, amounts=amounts, **idx)
+            if not payment_due_date:
+                payment_due_date = extract_label_date_lines(text, LBL_BOA_DUE, lines_ahead=1, **idx)
+        else:
+            if not new_balance:
+                new_balance = extract_label_amount_lines(text, LBL_NEWBAL, lines_ahead=3, avoid_zero=False, amounts=amounts, **idx)
+            if not credit_limit:
+                credit_limit = extract_label_amount_lines(text, LBL_LIMIT, lines_ahead=3, avoid_zero=True, min_value=500.0, amounts=amounts, **idx)
+            if not available_credit:
+                available_credit = extract_label_amount_lines(text, LBL_AVAIL, lines_ahead=3, avoid_zero=False, amounts=amounts, **idx)
+            if not payment_due_date:
+                payment_due_date = extract_label_date_lines(text, LBL_DUEDATE, lines_ahead=2, **idx)
 
     # 4) Compute missing fields where safe
     lim = _money_to_float(credit_limit)
@@ -479,12 +1069,25 @@ def parse_statement_text(text: str) -> ParsedStatement:
         credit_limit=credit_limit,
     )
 
-def parse_pdf(path: str) -> ParsedStatement:
-    text = ocr_pdf_to_text(path)
+def summary_complete(text: str) -> bool:
+    # Default short_circuit: the summary block (balance, limit, due date) has been read
+    parsed = parse_statement_text(text)
+    return bool(parsed.new_balance and parsed.credit_limit and parsed.payment_due_date)
+
+def parse_pdf(path: str, dpi: int = OCR_DPI, short_circuit: Optional[Callable[[str], bool]] = None) -> ParsedStatement:
+    text = ocr_pdf_to_text(path, dpi=dpi, short_circuit=short_circuit)
     parsed = parse_statement_text(text)
     parsed.file = path
     return parsed
 
+def parse_pdf_bytes(data: bytes, short_circuit: Optional[Callable[[str], bool]] = None) -> ParsedStatement:
+    # In-memory entry point (used by the Flask app); no temp file round-trip
+    return parse_statement_text(ocr_pdf_from_bytes(data, short_circuit=short_circuit))
+
+def parse_pdf_stream(stream: BinaryIO, short_circuit: Optional[Callable[[str], bool]] = None) -> ParsedStatement:
+    # Like parse_pdf_bytes, for a file-like upload that has not been read into memory
+    return parse_statement_text(ocr_pdf_from_stream(stream, short_circuit=short_circuit))
+
 
 # ---------- CLI ----------
 
@@ -492,13 +1095,13 @@ def main(argv: Optional[List[str]] = None) -> int:
     ap = argparse.ArgumentParser(description="OCR-based credit card statement parser (BOA/Chase/Commonwealth improved)")
     ap.add_argument("pdfs", nargs="+", help="PDF paths")
     ap.add_argument("--format", choices=["json", "csv"], default="json")
-    ap.add_argument("--dpi", type=int, default=340, help="Render DPI for OCR (default 340)")
+    ap.add_argument("--dpi", type=int, default=OCR_DPI, help=f"Render DPI for OCR (default {OCR_DPI})")
     args = ap.parse_args(argv)
 
     results: List[ParsedStatement] = []
     for p in args.pdfs:
         try:
-            results.append(parse_pdf(p))
+            results.append(parse_pdf(p, dpi=args.dpi))
         except Exception:
             results.append(ParsedStatement(
                 file=p,
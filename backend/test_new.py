@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Regression cases for new.py; run with: python -m unittest discover -s backend
+
+import unittest
+
+import new
+from new import _Word
+
+
+def _row(words, line, top=100, height=20):
+    # Word boxes for one OCR row: (text, left) pairs, all on `line`
+    return [_Word(text, left, top, left + 12 * len(text), top + height, line) for text, left in words]
+
+
+class SpatialSummaryTest(unittest.TestCase):
+    def test_label_inside_longer_label_of_another_field(self):
+        # "Credit Line" in "Available Credit Line" is not a credit-limit row
+        words = (_row([("Available", 50), ("Credit", 170), ("Line", 250), ("$2,000.00", 320)], 0, top=100)
+                 + _row([("Credit", 50), ("Limit", 130), ("$5,000.00", 320)], 1, top=140))
+        text = "Available Credit Line $2,000.00\nCredit Limit $5,000.00"
+        summary = new._spatial_summary(words)
+        self.assertNotIn("Credit Line $2,000.00", summary)
+        parsed = new.parse_statement_text("\n".join(summary + [text]))
+        self.assertEqual(parsed.credit_limit, new.parse_statement_text(text).credit_limit)
+        self.assertEqual(parsed.credit_limit, "$5,000.00")
+        self.assertEqual(parsed.available_credit, "$2,000.00")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,61 +2,108 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import hashlib
 import json
+import os
 import re
 import sys
+import threading
 import unicodedata
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import re2  # google-re2: one linear-time pass to tell which patterns can match
+except ImportError:
+    re2 = None
+
+try:
+    import ahocorasick  # pyahocorasick: all literal issuer markers in one pass
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson  # serializes the dataclasses itself, several times faster than json
+except ImportError:
+    orjson = None
+
+# PDF text backends, resolved once here rather than on every extract_text_from_pdf call
+try:
+    import pdfplumber  # type: ignore
+except ImportError:
+    pdfplumber = None
+
+try:
+    import PyPDF2  # type: ignore
+except ImportError:
+    PyPDF2 = None
+
+try:
+    from pdfminer.high_level import extract_text as pdfminer_extract_text  # type: ignore
+except ImportError:
+    pdfminer_extract_text = None
 
 # ---------------------------
 # PDF text extraction helpers
 # ---------------------------
 
+_BULLETS = re.compile(r"[·•●]+")
+_DOT_LEADERS = re.compile(r"\.{2,}")
+_SPACE_RUNS = re.compile(r"[ \t][ \t]+")
+
+def _pdfplumber_page_text(page) -> str:
+    text = page.extract_text() or ""
+    # pdf.pages keeps every page; drop this one's parsed chars/layout now, not at close.
+    # Page.close() (pdfplumber >= 0.11) also drops the cached text map; older pages
+    # only have flush_cache()
+    getattr(page, "close", page.flush_cache)()
+    return text
+
+def _pdfplumber_text(path: str) -> str:
+    with pdfplumber.open(path) as pdf:
+        return "\n".join(_pdfplumber_page_text(page) for page in pdf.pages)
+
+def _pypdf2_text(path: str) -> str:
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+def _pdfminer_text(path: str) -> str:
+    return pdfminer_extract_text(path) or ""
+
+# (backend, extractor) in the order they're tried; a missing backend is None
+_PDF_BACKENDS = [
+    (pdfplumber, _pdfplumber_text),
+    (PyPDF2, _pypdf2_text),
+    (pdfminer_extract_text, _pdfminer_text),
+]
+
 def extract_text_from_pdf(path: str) -> str:
     """
     Try extracting text using pdfplumber, then PyPDF2, then pdfminer.six as a fallback.
     """
     text = ""
-    # Attempt 1: pdfplumber
-    try:
-        import pdfplumber  # type: ignore
-        with pdfplumber.open(path) as pdf:
-            pages_text = []
-            for page in pdf.pages:
-                pages_text.append(page.extract_text() or "")
-            text = "\n".join(pages_text)
-    except Exception:
-        pass
-
-    # Attempt 2: PyPDF2
-    if not text.strip():
+    for backend, extract in _PDF_BACKENDS:
+        if backend is None:
+            continue
         try:
-            import PyPDF2  # type: ignore
-            with open(path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                pages_text = []
-                for page in reader.pages:
-                    pages_text.append(page.extract_text() or "")
-                text = "\n".join(pages_text)
+            text = extract(path)
         except Exception:
-            pass
+            continue
+        # First backend with any real text wins
+        if text.strip():
+            break
 
-    # Attempt 3: pdfminer.six
-    if not text.strip():
-        try:
-            from pdfminer.high_level import extract_text as pdfminer_extract_text  # type: ignore
-            text = pdfminer_extract_text(path) or ""
-        except Exception:
-            pass
-
-    # Normalize and clean text
+    # Normalize and clean text (NFKD also turns NBSP into a plain space)
     text = unicodedata.normalize("NFKD", text or "")
-    text = text.replace("\xa0", " ")
-    # Collapse leaders/dots & extra spaces
-    text = re.sub(r"[·•●•]+", " ", text)
-    text = re.sub(r"[\.]{2,}", " ", text)
-    text = re.sub(r"[ \t]{2,}", " ", text)
+    # Collapse leaders/dots & extra spaces; each pass only runs if it can change something
+    if not text.isascii():
+        text = _BULLETS.sub(" ", text)
+    if ".." in text:
+        text = _DOT_LEADERS.sub(" ", text)
+    text = _SPACE_RUNS.sub(" ", text)
     return text
 
 
@@ -67,7 +114,6 @@ def extract_text_from_pdf(path: str) -> str:
 ISSUER_DETECTORS: List[Tuple[str, List[re.Pattern]]] = [
     ("Bank of America", [
         re.compile(r"\bBank\s+of\s+America\b", re.I),
-        re.compile(r"\bBANK\s+OF\s+AMERICA\b"),
         re.compile(r"\bbankofamerica\.com\b", re.I),
         re.compile(r"\bBank\s*of\s*America,\s*N\.?A\.?\b", re.I),
         re.compile(r"\bBofA\b", re.I),
@@ -81,7 +127,6 @@ ISSUER_DETECTORS: List[Tuple[str, List[re.Pattern]]] = [
     ]),
     ("American Express", [
         re.compile(r"\bAmerican\s+Express\b", re.I),
-        re.compile(r"\bAMERICAN\s+EXPRESS\b"),
         re.compile(r"\bAMEX\b", re.I),
     ]),
     ("Citi", [
@@ -106,6 +151,9 @@ DATE_MIXED = re.compile(r"\b([A-Za-z]{3,9}\s+\d{1,2},\s*\d{2,4})\b")
 SEP = r"[ \t]*[:\-\._]*[ \t]*"
 
 # Multiline anchors help grab values from the same row (common in issuer summary tables)
+# Each field keeps an ordered list rather than one alternation: a `re` union
+# loses the literal-prefix scan and measures slower than trying them in turn,
+# and the RE2 prefilter below already tells in one pass which of them can match.
 PATTERNS = {
     "available_credit": [
         re.compile(rf"(?mi)^\s*Available\s*(?:Credit|to\s*Spend|Line|Credit\s*Line)\s+(\$?\s*{AMOUNT_CORE})\b"),
@@ -195,27 +243,103 @@ ISSUER_SPECIFIC: Dict[str, Dict[str, List[re.Pattern]]] = {
     },
 }
 
-def detect_issuer(text: str) -> Optional[str]:
-    for issuer, patterns in ISSUER_DETECTORS:
-        if any(p.search(text) for p in patterns):
-            return issuer
-    return None
+# Per issuer, each field's patterns in the order they're tried: the generic ones,
+# then that issuer's fallbacks (an issuer without fallbacks just uses PATTERNS).
+# A fallback with the same source and flags as an earlier pattern (Chase's credit
+# limit row, Amex's new balance row, ...) matches exactly where that one already
+# failed, so it is left out of the chain.
+def _chain(pats: List[re.Pattern]) -> List[re.Pattern]:
+    seen: Dict[Tuple[str, int], re.Pattern] = {}
+    for p in pats:
+        seen.setdefault((p.pattern, p.flags), p)
+    return list(seen.values())
+
+ISSUER_CHAINS: Dict[str, Dict[str, List[re.Pattern]]] = {
+    issuer: {field: _chain(pats + fallbacks.get(field, [])) for field, pats in PATTERNS.items()}
+    for issuer, fallbacks in ISSUER_SPECIFIC.items()
+}
 
-def _first_group(m: re.Match) -> Optional[str]:
-    if not m:
-        return None
-    for g in m.groups():
-        if g and isinstance(g, str) and g.strip():
-            return g.strip()
-    return None
+# Most issuer markers are plain words: "\bBank\s+of\s+America\b" is the literal
+# "bank of america" in lowercased text with whitespace runs collapsed to one
+# space, plus word-boundary checks at both ends. Those go into one Aho-Corasick
+# automaton; the rest ("\s*", optional characters, case-sensitive, ...) stay
+# regexes. Lowercasing only mirrors re.I on ASCII text (re.I also folds "ſ" to
+# "s", "K" to "k", ...), so other text takes the regexes alone.
+_LITERAL_MARKER = re.compile(r"\\b((?:[A-Za-z0-9]|\\s\+|\\\.)+)(?:\\b)?(?:\\b|\(\?!\\w\))")
+# A marker spelled letter by letter, for OCR that spaces them out ("B\s*A\s*N\s*K..."),
+# can only match if the folded text with its spaces squeezed out holds those
+# letters in a row; that substring check is far cheaper than the regex.
+_SPACED_MARKER = re.compile(r"\\b((?:[A-Za-z]\\s\*)+[A-Za-z])\\b")
+_SPACED_LETTERS: Dict[re.Pattern, str] = {
+    p: m.group(1).replace(r"\s*", "").lower()
+    for _, pats in ISSUER_DETECTORS for p in pats
+    if p.flags & re.I and (m := _SPACED_MARKER.fullmatch(p.pattern))
+}
 
-def find_first_match(text: str, patterns: List[re.Pattern]) -> Optional[str]:
+def _build_issuer_automaton() -> Tuple[Any, List[List[re.Pattern]]]:
+    residual: List[List[re.Pattern]] = []
+    automaton = ahocorasick.Automaton() if ahocorasick is not None else None
+    for rank, (_, pats) in enumerate(ISSUER_DETECTORS):
+        residual.append([])
+        for p in pats:
+            m = _LITERAL_MARKER.fullmatch(p.pattern) if p.flags & re.I else None
+            if automaton is None or m is None:
+                residual[rank].append(p)
+                continue
+            marker = m.group(1).replace(r"\s+", " ").replace(r"\.", ".").lower()
+            automaton.add_word(marker, (rank, len(marker)))
+    if automaton is not None:
+        automaton.make_automaton()
+    return automaton, residual
+
+_ISSUER_AUTOMATON, _ISSUER_RESIDUAL = _build_issuer_automaton()
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+def detect_issuer(text: str, hits: Optional[Set[int]] = None) -> Optional[str]:
+    engines = _engines(text)
+    # With the prefilter's hits the loop below only runs markers that match; that beats the automaton
+    if hits is not None or _ISSUER_AUTOMATON is None or not text.isascii():
+        for issuer, patterns in ISSUER_DETECTORS:
+            if any(_can_match(p, hits) and engines.get(p, p).search(text) for p in patterns):
+                return issuer
+        return None
+    # Best (lowest) rank among the literal markers found
+    best = len(ISSUER_DETECTORS)
+    folded = " ".join(text.lower().split())
+    for end, (rank, size) in _ISSUER_AUTOMATON.iter(folded):
+        start = end - size + 1
+        if rank >= best:
+            continue
+        if start > 0 and _is_word_char(folded[start - 1]):
+            continue
+        if end + 1 < len(folded) and _is_word_char(folded[end + 1]):
+            continue
+        best = rank
+        if best == 0:
+            break
+    # Only issuers ranked above the best literal hit still need their regexes
+    squeezed = folded.replace(" ", "") if best else ""
+    for rank in range(best):
+        if any(_can_match(p, hits) and _SPACED_LETTERS.get(p, "") in squeezed and engines.get(p, p).search(text)
+               for p in _ISSUER_RESIDUAL[rank]):
+            return ISSUER_DETECTORS[rank][0]
+    return ISSUER_DETECTORS[best][0] if best < len(ISSUER_DETECTORS) else None
+
+def find_first_match(text: str, patterns: List[re.Pattern], hits: Optional[Set[int]] = None) -> Optional[str]:
+    engines = _engines(text)
     for p in patterns:
-        m = p.search(text)
-        if m:
-            out = _first_group(m)
-            if out:
-                return out
+        if not _can_match(p, hits):
+            continue
+        m = engines.get(p, p).search(text)
+        if not m:
+            continue
+        # The value is group 1, except in the rf-string ".{0,160}?" patterns, where
+        # the braces turned into a leading "(0, 160)" group: take the first non-blank
+        out = m[1] if p.groups == 1 else next((g for g in m.groups() if g and g.strip()), None)
+        if out and out.strip():
+            return out.strip()
     return None
 
 def sanitize_amount_str(value: Optional[str]) -> Optional[str]:
@@ -235,20 +359,59 @@ def parse_money_to_float(v: str) -> Optional[float]:
     except Exception:
         return None
 
-def extract_by_label_line(text: str, label_regexes: List[re.Pattern], lines_ahead: int = 2) -> Optional[str]:
+_DIGITS = frozenset("0123456789")
+
+def _currency_matches(s: str, curr_strict: re.Pattern, curr_relaxed: re.Pattern) -> List[re.Match]:
+    # Both currency patterns need an ASCII digit; most text after a label has none,
+    # and a set check rejects it for a fraction of the cost of two finditer() calls
+    if _DIGITS.isdisjoint(s):
+        return []
+    return list(curr_strict.finditer(s)) or list(curr_relaxed.finditer(s))
+
+# Line breaks str.splitlines() honors besides "\n"
+_OTHER_LINE_BREAKS = re.compile(r"[\r\v\f\x1c-\x1e\x85\u2028\u2029]")
+_NEWLINE = re.compile(r"\n")
+
+def line_text(text: str) -> str:
+    """`text` with "\n" as its only line break, so lines can be addressed by offset."""
+    # PDF text normally has nothing else and is used as is
+    return "\n".join(text.splitlines()) if _OTHER_LINE_BREAKS.search(text) else text
+
+def _line_at(body: str, start: int) -> Tuple[str, int]:
+    """The line of `body` (from line_text()) starting at `start`, and the next line's start (-1: none)."""
+    end = body.find("\n", start)
+    if end == -1:
+        return body[start:], -1
+    return body[start:end], end + 1
+
+def extract_by_label_line(body: str, label_regexes: List[re.Pattern], lines_ahead: int = 2,
+                          hits: Optional[Set[int]] = None,
+                          engines: Optional[Dict[re.Pattern, Any]] = None,
+                          starts: Optional[List[int]] = None) -> Optional[str]:
     """
     Grab the first currency that appears on the SAME line after the label.
     If none, look ahead up to 'lines_ahead' lines. Prefer the first non-zero amount.
+    `body` is the statement text from line_text(); `engines` is _engines() of the
+    text and `starts` the label_lines() entry for this field (None: try every line).
     """
-    lines = text.splitlines()
-    for i, line in enumerate(lines):
+    engines = engines or {}
+    # a label that can't match anywhere in the text can't match on any line
+    label_regexes = [engines.get(lr, lr) for lr in label_regexes if _can_match(lr, hits)]
+    if not label_regexes:
+        return None
+    curr_strict = engines.get(CURR_STRICT, CURR_STRICT)
+    curr_relaxed = engines.get(CURR_RELAXED, CURR_RELAXED)
+    if starts is None:
+        starts = [0] + [m.end() for m in _NEWLINE.finditer(body)]
+    for start in starts:
+        line, next_start = _line_at(body, start)
         for lr in label_regexes:
             m = lr.search(line)
             if not m:
                 continue
             fragment = line[m.end():]
             # same-line candidates AFTER the label
-            same_line = list(CURR_STRICT.finditer(fragment)) or list(CURR_RELAXED.finditer(fragment))
+            same_line = _currency_matches(fragment, curr_strict, curr_relaxed)
             if same_line:
                 vals = [it.group(0).strip() for it in same_line]
                 # pick first non-zero if available, else first
@@ -258,11 +421,12 @@ def extract_by_label_line(text: str, label_regexes: List[re.Pattern], lines_ahea
                 return sanitize_amount_str(vals[0])
 
             # look into next few lines
-            for j in range(1, lines_ahead + 1):
-                if i + j >= len(lines):
+            ahead = next_start
+            for _ in range(lines_ahead):
+                if ahead == -1:
                     break
-                l2 = lines[i + j]
-                cands = list(CURR_STRICT.finditer(l2)) or list(CURR_RELAXED.finditer(l2))
+                l2, ahead = _line_at(body, ahead)
+                cands = _currency_matches(l2, curr_strict, curr_relaxed)
                 if cands:
                     vals = [it.group(0).strip() for it in cands]
                     for raw in vals:
@@ -296,8 +460,146 @@ LBL_CREDIT_LIMIT = [
     re.compile(r"\bCredit\s*Line\b", re.I),
     re.compile(r"\bRevolving\s*Credit\s*Line\b", re.I),
 ]
+# One group per field, matching wherever any of that field's LBL_* regexes does
+# on a line of line_text() (the spaces inside a label never cross a "\n"). No
+# alternative can start inside another's match (hence "Remaining", not
+# "Remaining\s*Credit", which would swallow the "Credit" of "Credit Limit"), so
+# finditer() sees every label.
+MASTER_LABEL = re.compile(
+    r"(?=[ADNRC])"  # rejects most positions before trying the alternatives
+    r"(?:(?P<available_credit>Available|Remaining)"
+    r"|(?P<payment_due_date>Due[^\S\n]*Date)"
+    r"|(?P<new_balance>New[^\S\n]*Balance)"
+    r"|(?P<credit_limit>Credit[^\S\n]*(?:Limit|Line|Access)))",
+    re.I,
+)
+def label_lines(body: str, engines: Optional[Dict[re.Pattern, Any]] = None) -> Dict[str, List[int]]:
+    """Field -> start offsets of the lines of `body` (from line_text()) that may hold its label."""
+    master = (engines or {}).get(MASTER_LABEL, MASTER_LABEL)
+    starts: Dict[str, List[int]] = {field: [] for field in MASTER_LABEL.groupindex}
+    start, pos = 0, 0
+    for m in master.finditer(body):
+        # only the stretch since the previous label is searched for a newer line start
+        nl = body.rfind("\n", pos, m.start())
+        if nl != -1:
+            start = nl + 1
+        pos = m.start()
+        found = starts[m.lastgroup]
+        if not found or found[-1] != start:
+            found.append(start)
+    return starts
+
+# ---------------------------
+# One-pass prefilter
+# ---------------------------
+# Every pattern above also goes into one RE2 set, scanned once per statement to
+# learn which patterns can match at all; only those are then run with `re`.
+# The RE2 copies are loosened so they match wherever `re` would (word-boundary
+# checks dropped, \s and \d widened to cover Python's Unicode classes, and "^"
+# dropped since label rows come from splitlines(), which also breaks lines at
+# \r, \x85 and the like), so a pattern is only ever skipped when it cannot
+# match and results are unchanged.
+_RE2_WIDEN = [
+    (r"(?!\w)", ""),
+    (r"\b", ""),
+    (r"(?mi)^", "(?mi)"),
+    (r"\s", r"[\t-\r\x1c-\x20\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}]"),
+    (r"\d", r"[0-9\x{80}-\x{10ffff}]"),
+]
+# re.I matches these against "i"; RE2's case folding doesn't
+_RE2_TEXT_FOLD = {0x130: "i", 0x131: "i"}
+
+def _re2_flags(p: re.Pattern, src: str) -> str:
+    flags = "".join(f for flag, f in ((re.I, "i"), (re.M, "m"), (re.S, "s")) if p.flags & flag)
+    return f"(?{flags}){src}" if flags else src
+
+def _re2_source(p: re.Pattern) -> str:
+    src = p.pattern
+    for old, new in _RE2_WIDEN:
+        src = src.replace(old, new)
+    return _re2_flags(p, src)
+
+_ALL_PATTERNS: List[re.Pattern] = [p for _, pats in ISSUER_DETECTORS for p in pats]
+_ALL_PATTERNS += [p for pats in PATTERNS.values() for p in pats]
+_ALL_PATTERNS += [p for fields in ISSUER_SPECIFIC.values() for pats in fields.values() for p in pats]
+_ALL_PATTERNS += LBL_AVAIL_CREDIT + LBL_DUE_DATE + LBL_NEW_BAL + LBL_CREDIT_LIMIT
+
+def _build_prefilter() -> Tuple[Optional["re2.Set"], Dict[re.Pattern, int]]:
+    if re2 is None:
+        return None, {}
+    prefilter = re2.Set.SearchSet()
+    ids: Dict[re.Pattern, int] = {}
+    for p in _ALL_PATTERNS:
+        if p not in ids:
+            ids[p] = prefilter.Add(_re2_source(p))
+    prefilter.Compile()
+    return prefilter, ids
+
+_PREFILTER, _PREFILTER_IDS = _build_prefilter()
+
+def _scan(text: str) -> Optional[Set[int]]:
+    """Ids of the patterns that may match somewhere in `text` (None: no prefilter)."""
+    if _PREFILTER is None:
+        return None
+    if not text.isascii():
+        text = text.translate(_RE2_TEXT_FOLD)
+    try:
+        return set(_PREFILTER.Match(text) or ())
+    except UnicodeEncodeError:
+        # lone surrogates (broken PDF text) can't go to RE2; run every pattern
+        return None
+
+def _can_match(p: re.Pattern, hits: Optional[Set[int]]) -> bool:
+    return hits is None or p not in _PREFILTER_IDS or _PREFILTER_IDS[p] in hits
 
-@dataclass
+LABELS: Dict[str, List[re.Pattern]] = {
+    "available_credit": LBL_AVAIL_CREDIT,
+    "payment_due_date": LBL_DUE_DATE,
+    "new_balance": LBL_NEW_BAL,
+    "credit_limit": LBL_CREDIT_LIMIT,
+}
+# Field -> prefilter ids of all its labels (None if one of them isn't in the prefilter)
+_LABEL_IDS: Dict[str, Optional[frozenset]] = {
+    field: frozenset(_PREFILTER_IDS[p] for p in labels) if all(p in _PREFILTER_IDS for p in labels) else None
+    for field, labels in LABELS.items()
+}
+
+def _labels_can_match(field: str, hits: Optional[Set[int]]) -> bool:
+    ids = _LABEL_IDS[field]
+    return hits is None or ids is None or not hits.isdisjoint(ids)
+
+# Twins that stand in for the patterns when the text is ASCII, where they match
+# exactly what the Unicode patterns do:
+# - an re.ASCII copy of every pattern, which skips Unicode case folding and
+#   word tables (about 2x faster). Unicode \s also takes \x1c-\x1f, so the copy
+#   spells \s out as [\t-\r\x1c-\x20], and [^\S\n] as [\t\v\f\r\x1c-\x20].
+# - with RE2 installed, the cross-line ".{0,N}?" patterns, where `re`
+#   backtracks through every label occurrence, run there instead (\b and \d
+#   only differ from `re` past ASCII; \s is spelled out the same way). The
+#   rest stay on `re`: they fail fast or are already known to match, and RE2's
+#   per-call cost (encoding the text) measured slower.
+_LAZY_SPAN = re.compile(r"\.\{0,\d+\}\?")
+_PY_ASCII_SPACE = r"[\t-\r\x1c-\x20]"  # what Unicode \s matches below 0x80
+
+def _ascii_twin(p: re.Pattern) -> re.Pattern:
+    src = p.pattern.replace(r"[^\S\n]", r"[\t\v\f\r\x1c-\x20]").replace(r"\s", _PY_ASCII_SPACE)
+    return re.compile(src, (p.flags & ~re.UNICODE) | re.ASCII)
+
+def _build_twins() -> Dict[re.Pattern, Any]:
+    patterns = _ALL_PATTERNS + [CURR_STRICT, CURR_RELAXED, DATE_NUMERIC, DATE_MIXED, MASTER_LABEL]
+    twins: Dict[re.Pattern, Any] = {p: _ascii_twin(p) for p in patterns}
+    if re2 is not None:
+        twins.update((p, re2.compile(_re2_flags(p, p.pattern.replace(r"\s", _PY_ASCII_SPACE))))
+                     for p in patterns if _LAZY_SPAN.search(p.pattern))
+    return twins
+
+_TWINS = _build_twins()
+
+def _engines(text: str) -> Dict[re.Pattern, Any]:
+    """Pattern -> the engine to run it with on `text` (str.isascii() is O(1))."""
+    return _TWINS if text.isascii() else {}
+
+@dataclass(slots=True)
 class ParsedStatement:
     file: str
     card_provider: Optional[str]
@@ -306,47 +608,82 @@ class ParsedStatement:
     new_balance: Optional[str]
     credit_limit: Optional[str]
 
+# Field names, in order, for the flat dicts the CLI writes (asdict() would also
+# deep-copy every value)
+_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(ParsedStatement))
+
+# Batches often repeat a PDF (re-runs, reprocessing); a repeat costs a hash of
+# its text instead of the regex passes
+PARSE_CACHE_SIZE = 256
+_parse_cache: "OrderedDict[bytes, ParsedStatement]" = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
 def parse_statement_text(text: str) -> ParsedStatement:
-    issuer = detect_issuer(text) or "Unknown"
-
-    # Primary regex paths
-    available_credit = find_first_match(text, PATTERNS["available_credit"])
-    payment_due_date = find_first_match(text, PATTERNS["payment_due_date"])
-    new_balance = find_first_match(text, PATTERNS["new_balance"])
-    credit_limit = find_first_match(text, PATTERNS["credit_limit"])
-
-    # Issuer-specific fallbacks
-    if issuer in ISSUER_SPECIFIC:
-        isp = ISSUER_SPECIFIC[issuer]
-        if not available_credit and "available_credit" in isp:
-            available_credit = find_first_match(text, isp["available_credit"])
-        if not payment_due_date and "payment_due_date" in isp:
-            payment_due_date = find_first_match(text, isp["payment_due_date"])
-        if not new_balance and "new_balance" in isp:
-            new_balance = find_first_match(text, isp["new_balance"])
-        if not credit_limit and "credit_limit" in isp:
-            credit_limit = find_first_match(text, isp["credit_limit"])
-
-    # Line-based fallbacks (robust for column wraps)
-    if not available_credit:
-        available_credit = extract_by_label_line(text, LBL_AVAIL_CREDIT, lines_ahead=3)
-    if not payment_due_date:
-        # date from same/next line
-        lines = text.splitlines()
-        got_date = None
-        for i, line in enumerate(lines):
-            if any(p.search(line) for p in LBL_DUE_DATE):
-                m = DATE_NUMERIC.search(line) or DATE_MIXED.search(line)
-                if not m and i + 1 < len(lines):
-                    m = DATE_NUMERIC.search(lines[i + 1]) or DATE_MIXED.search(lines[i + 1])
-                if m:
-                    got_date = m.group(1)
-                    break
-        payment_due_date = got_date
-    if not new_balance:
-        new_balance = extract_by_label_line(text, LBL_NEW_BAL, lines_ahead=3)
-    if not credit_limit:
-        credit_limit = extract_by_label_line(text, LBL_CREDIT_LIMIT, lines_ahead=3)
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    with _parse_cache_lock:
+        parsed = _parse_cache.get(key)
+        if parsed is not None:
+            _parse_cache.move_to_end(key)
+    if parsed is None:
+        parsed = _parse_statement_text(text)
+        with _parse_cache_lock:
+            _parse_cache[key] = parsed
+            while len(_parse_cache) > PARSE_CACHE_SIZE:
+                _parse_cache.popitem(last=False)
+    # callers may set .file; the cached instance stays as parsed
+    return replace(parsed)
+
+def _parse_statement_text(text: str) -> ParsedStatement:
+    # One pass over the text up front; every regex below is skipped if it can't match
+    hits = _scan(text)
+    issuer = detect_issuer(text, hits) or "Unknown"
+
+    # Primary regex paths, then the issuer-specific fallbacks
+    chains = ISSUER_CHAINS.get(issuer, PATTERNS)
+    available_credit = find_first_match(text, chains["available_credit"], hits)
+    payment_due_date = find_first_match(text, chains["payment_due_date"], hits)
+    new_balance = find_first_match(text, chains["new_balance"], hits)
+    credit_limit = find_first_match(text, chains["credit_limit"], hits)
+
+    # Line-based fallbacks (robust for column wraps), skipped outright once the
+    # patterns above filled every field, as they do for most statements. Every
+    # field's label lines are found once for all of them, not at all if no missing
+    # field's label can appear
+    missing = [field for field, value in (("available_credit", available_credit), ("payment_due_date", payment_due_date),
+                                          ("new_balance", new_balance), ("credit_limit", credit_limit)) if not value]
+    if missing:
+        engines = _engines(text)
+        body = ""
+        starts: Dict[str, List[int]] = {field: [] for field in MASTER_LABEL.groupindex}
+        if any(_labels_can_match(field, hits) for field in missing):
+            body = line_text(text)
+            starts = label_lines(body, engines)
+        if not available_credit:
+            available_credit = extract_by_label_line(body, LBL_AVAIL_CREDIT, lines_ahead=3, hits=hits,
+                                                     engines=engines, starts=starts["available_credit"])
+        due_labels = [engines.get(p, p) for p in LBL_DUE_DATE if _can_match(p, hits)] if not payment_due_date else []
+        if due_labels:
+            # date from same/next line
+            date_numeric = engines.get(DATE_NUMERIC, DATE_NUMERIC)
+            date_mixed = engines.get(DATE_MIXED, DATE_MIXED)
+            got_date = None
+            for start in starts["payment_due_date"]:
+                line, next_start = _line_at(body, start)
+                if any(p.search(line) for p in due_labels):
+                    m = date_numeric.search(line) or date_mixed.search(line)
+                    if not m and next_start != -1:
+                        next_line = _line_at(body, next_start)[0]
+                        m = date_numeric.search(next_line) or date_mixed.search(next_line)
+                    if m:
+                        got_date = m.group(1)
+                        break
+            payment_due_date = got_date
+        if not new_balance:
+            new_balance = extract_by_label_line(body, LBL_NEW_BAL, lines_ahead=3, hits=hits,
+                                                engines=engines, starts=starts["new_balance"])
+        if not credit_limit:
+            credit_limit = extract_by_label_line(body, LBL_CREDIT_LIMIT, lines_ahead=3, hits=hits,
+                                                 engines=engines, starts=starts["credit_limit"])
 
     # Clean amounts
     available_credit = sanitize_amount_str(available_credit) if available_credit else None
@@ -389,35 +726,51 @@ def main(argv: Optional[List[str]] = None) -> int:
     ap.add_argument("--format", choices=["json", "csv"], default="json", help="Output format.")
     args = ap.parse_args(argv)
 
+    def _failed(path: str) -> ParsedStatement:
+        return ParsedStatement(
+            file=path,
+            card_provider=None,
+            available_credit=None,
+            payment_due_date=None,
+            new_balance=None,
+            credit_limit=None,
+        )
+
     results: List[ParsedStatement] = []
-    for path in args.pdfs:
-        try:
-            results.append(parse_pdf(path))
-        except Exception:
-            results.append(ParsedStatement(
-                file=path,
-                card_provider=None,
-                available_credit=None,
-                payment_due_date=None,
-                new_balance=None,
-                credit_limit=None,
-            ))
+    workers = min(os.cpu_count() or 1, len(args.pdfs))
+    if workers <= 1:
+        for path in args.pdfs:
+            try:
+                results.append(parse_pdf(path))
+            except Exception:
+                results.append(_failed(path))
+    else:
+        # Text extraction dominates and each PDF is independent: one process per core
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = [ex.submit(parse_pdf, path) for path in args.pdfs]
+            for path, fut in zip(args.pdfs, futures):
+                try:
+                    results.append(fut.result())
+                except Exception:
+                    results.append(_failed(path))
 
     if args.format == "json":
-        print(json.dumps([asdict(r) for r in results], indent=2))
+        out = getattr(sys.stdout, "buffer", None)  # None if stdout was swapped for a text stream
+        if orjson is not None and out is not None:
+            # same document, but non-ASCII is written as UTF-8 rather than \u escapes
+            sys.stdout.flush()
+            out.write(orjson.dumps(results, option=orjson.OPT_INDENT_2) + b"\n")
+        else:
+            print(json.dumps([{f: getattr(r, f) for f in _FIELDS} for r in results], indent=2))
     else:
         import csv
         writer = csv.writer(sys.stdout, lineterminator="\n")
-        writer.writerow(["file", "card_provider", "available_credit", "payment_due_date", "new_balance", "credit_limit"])
-        for r in results:
-            writer.writerow([
-                r.file,
-                r.card_provider or "",
-                r.available_credit or "",
-                r.payment_due_date or "",
-                r.new_balance or "",
-                r.credit_limit or "",
-            ])
+        writer.writerow(_FIELDS)
+        writer.writerows(
+            (r.file, r.card_provider or "", r.available_credit or "", r.payment_due_date or "",
+             r.new_balance or "", r.credit_limit or "")
+            for r in results
+        )
 
     return 0
 